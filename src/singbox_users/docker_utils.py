@@ -1,34 +1,111 @@
-"""Docker helpers used by the singbox-users TUI."""
+"""Docker helpers used by the singbox-users TUI.
+
+Requests go to the Docker Engine API over its UNIX socket through one reused
+connection whenever the socket is reachable; the docker CLI is the fallback.
+"""
 
 from __future__ import annotations
 
+import hashlib
+import http.client
+import json
+import os
 from pathlib import Path
+import socket
+import struct
 import subprocess
+from typing import TYPE_CHECKING, cast
+from urllib.parse import quote
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from .singbox_config import JSONObject
+
+CONTAINER_CONFIG_DIR = "/etc/sing-box"
+CONTAINER_CONFIG_PATH = f"{CONTAINER_CONFIG_DIR}/config.json"
+DOCKER_TIMEOUT = 25
+EXEC_UNAVAILABLE_MARKERS = ("is not running", "No such container")
+DEFAULT_DOCKER_SOCKET = "/var/run/docker.sock"
+HTTP_OK = 200
+HTTP_CREATED = 201
+HTTP_NOT_FOUND = 404
+HTTP_CONFLICT = 409
+HTTP_MULTIPLE_CHOICES = 300
+HTTP_SERVER_ERROR = 500
+STREAM_FRAME_HEADER = struct.Struct(">BxxxI")
 
+# Docker commands run on a single worker thread, so one connection per socket
+# is enough and needs no locking.
+_ENGINE_CONNECTIONS: dict[str, _UnixHTTPConnection] = {}
+# Output of successful checks keyed by (config sha256, image, container). Only
+# results that read config_path's bytes land here: the `docker run` check or an
+# exec check in a container that bind-mounts the config's directory.
+_VALIDATED_CONFIGS: dict[tuple[str, str, str | None], str] = {}
+# Whether exec in a container reads the host config, keyed by
+# (container, host config path). Mounts only change when the container is
+# recreated, so one inspect per session is enough.
+_EXEC_SEES_CONFIG: dict[tuple[str, Path], bool] = {}
 
-def check_config(config_path: Path, image: str) -> tuple[bool, str]:
-    """Validate sing-box config.json using `docker run ... check`."""
+
+def check_config(
+    config_path: Path, image: str, container: str | None = None
+) -> tuple[bool, str]:
+    """Validate sing-box config.json, preferring the running container.
+
+    Runs `sing-box check` in the existing container when it bind-mounts the
+    config's directory, so no new container has to be created. A single-file
+    bind mount keeps showing the old inode after an atomic save, so otherwise
+    the check runs via `docker run --rm <image> check` with config_path
+    mounted. A config whose exact bytes already passed the check in this
+    session is not checked again.
+    """
 
     config_path = Path(config_path)
-    cmd = [
-        "docker",
-        "run",
-        "--rm",
-        "-v",
-        f"{config_path}:/etc/sing-box/config.json:ro",
-        image,
-        "check",
-        "-c",
-        "/etc/sing-box/config.json",
-    ]
+    digest = _file_digest(config_path)
+    if digest is None:
+        return _run_check(config_path, image, container)
+    key = (digest, image, container)
+    cached = _VALIDATED_CONFIGS.get(key)
+    if cached is not None:
+        return True, cached
+    ok, out = _run_check(config_path, image, container)
+    # A save while the check ran means it may have seen other bytes.
+    if ok and _file_digest(config_path) == digest:
+        _VALIDATED_CONFIGS[key] = out
+    return ok, out
+
+
+def _file_digest(path: Path) -> str | None:
     try:
-        proc = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            timeout=25,
-            check=False,
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _run_check(
+    config_path: Path, image: str, container: str | None
+) -> tuple[bool, str]:
+    try:
+        if container and _exec_sees_config(container, config_path):
+            result = _exec_in_container(
+                container, ["sing-box", "check", "-c", CONTAINER_CONFIG_PATH]
+            )
+            if result is not None:
+                return result
+        proc = _run_docker(
+            [
+                "run",
+                "--rm",
+                "--network=none",
+                "--read-only",
+                "-v",
+                f"{config_path}:{CONTAINER_CONFIG_PATH}:ro",
+                image,
+                "check",
+                "-c",
+                CONTAINER_CONFIG_PATH,
+            ]
         )
         ok = proc.returncode == 0
         return ok, (proc.stdout or "").strip()
@@ -38,20 +115,245 @@ def check_config(config_path: Path, image: str) -> tuple[bool, str]:
         return False, f"check error: {exc}"
 
 
+def _exec_sees_config(container: str, config_path: Path) -> bool:
+    """Return True when the container bind-mounts config_path's directory."""
+
+    key = (container, config_path)
+    sees = _EXEC_SEES_CONFIG.get(key)
+    if sees is None:
+        mounts = _container_mounts(container)
+        if mounts is None:
+            return False
+        host_dir = config_path.resolve().parent
+        sees = config_path.name == Path(CONTAINER_CONFIG_PATH).name and any(
+            mount.get("Type") == "bind"
+            and mount.get("Destination") == CONTAINER_CONFIG_DIR
+            and Path(str(mount.get("Source"))).resolve() == host_dir
+            for mount in mounts
+        )
+        _EXEC_SEES_CONFIG[key] = sees
+    return sees
+
+
+def _container_mounts(container: str) -> list[dict[str, object]] | None:
+    """Return the container's Mounts list; None when it cannot be inspected."""
+
+    socket_path = _engine_socket_path()
+    if socket_path is not None:
+        try:
+            status, body = _engine_request(
+                socket_path, "GET", f"/containers/{_quote(container)}/json"
+            )
+        except OSError:
+            pass
+        else:
+            if status != HTTP_OK:
+                return None
+            return _mount_list(_json_object(body).get("Mounts"))
+    proc = _run_docker(["inspect", "--format", "{{json .Mounts}}", container])
+    if proc.returncode != 0:
+        return None
+    try:
+        return _mount_list(json.loads(proc.stdout))
+    except ValueError:
+        return None
+
+
+def _mount_list(data: object) -> list[dict[str, object]] | None:
+    if not isinstance(data, list):
+        return None
+    return [
+        cast("dict[str, object]", mount) for mount in data if isinstance(mount, dict)
+    ]
+
+
 def restart_container(container: str) -> tuple[bool, str]:
     """Restart a docker container by name."""
 
+    socket_path = _engine_socket_path()
+    engine_error = ""
+    if socket_path is not None:
+        try:
+            status, body = _engine_request(
+                socket_path, "POST", f"/containers/{_quote(container)}/restart"
+            )
+        except OSError:
+            pass
+        else:
+            if HTTP_OK <= status < HTTP_MULTIPLE_CHOICES:
+                return True, container
+            engine_error = _engine_error_message(body)
+            if status >= HTTP_SERVER_ERROR:
+                return False, engine_error
+            # A 404 may come from a socket that is not the CLI's daemon.
     try:
-        proc = subprocess.run(
-            ["docker", "restart", container],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            timeout=25,
-            check=False,
-        )
-        return proc.returncode == 0, (proc.stdout or "").strip()
+        proc = _run_docker(["restart", container])
+        ok, out = proc.returncode == 0, (proc.stdout or "").strip()
     except FileNotFoundError:
-        return False, "docker not found"
+        ok, out = False, "docker not found"
     except (subprocess.TimeoutExpired, subprocess.SubprocessError, OSError) as exc:
-        return False, f"restart error: {exc}"
+        ok, out = False, f"restart error: {exc}"
+    if not ok and engine_error:
+        out = f"engine: {engine_error}\n{out}"
+    return ok, out
+
+
+def _exec_in_container(container: str, cmd: list[str]) -> tuple[bool, str] | None:
+    """Run cmd in a running container; None when the container is unavailable."""
+
+    socket_path = _engine_socket_path()
+    if socket_path is not None:
+        try:
+            return _engine_exec(socket_path, container, cmd)
+        except OSError:
+            pass
+    proc = _run_docker(["exec", container, *cmd])
+    out = (proc.stdout or "").strip()
+    if proc.returncode != 0 and any(
+        marker in out for marker in EXEC_UNAVAILABLE_MARKERS
+    ):
+        return None
+    return proc.returncode == 0, out
+
+
+def _engine_exec(
+    socket_path: str, container: str, cmd: list[str]
+) -> tuple[bool, str] | None:
+    status, body = _engine_request(
+        socket_path,
+        "POST",
+        f"/containers/{_quote(container)}/exec",
+        {"AttachStdout": True, "AttachStderr": True, "Cmd": list(cmd)},
+    )
+    if status in {HTTP_NOT_FOUND, HTTP_CONFLICT}:
+        return None
+    if status != HTTP_CREATED:
+        return False, _engine_error_message(body)
+    exec_id = str(_json_object(body).get("Id", ""))
+    status, body = _engine_request(
+        socket_path,
+        "POST",
+        f"/exec/{_quote(exec_id)}/start",
+        {"Detach": False, "Tty": False},
+    )
+    if status != HTTP_OK:
+        return False, _engine_error_message(body)
+    output = _demux_stream(body)
+    status, body = _engine_request(socket_path, "GET", f"/exec/{_quote(exec_id)}/json")
+    if status != HTTP_OK:
+        return False, _engine_error_message(body)
+    exit_code = _json_object(body).get("ExitCode")
+    return exit_code == 0, output.strip()
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection to the Docker Engine over a UNIX domain socket."""
+
+    def __init__(self, socket_path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+def _engine_socket_path() -> str | None:
+    if _docker_context_selected():
+        return None
+    host = os.environ.get("DOCKER_HOST", "")
+    if host and not host.startswith("unix://"):
+        return None
+    path = host.removeprefix("unix://") or DEFAULT_DOCKER_SOCKET
+    return path if Path(path).is_socket() else None
+
+
+def _docker_context_selected() -> bool:
+    """Return True when a docker CLI context other than "default" is active.
+
+    Such a context may point at a rootless or remote daemon, so only the CLI
+    knows where to send the request.
+    """
+
+    context = os.environ.get("DOCKER_CONTEXT", "")
+    if not context:
+        config_dir = Path(os.environ.get("DOCKER_CONFIG") or "~/.docker").expanduser()
+        try:
+            raw = (config_dir / "config.json").read_bytes()
+        except OSError:
+            raw = b""
+        current = _json_object(raw).get("currentContext")
+        context = current if isinstance(current, str) else ""
+    return context not in {"", "default"}
+
+
+def _engine_request(
+    socket_path: str, method: str, url: str, payload: JSONObject | None = None
+) -> tuple[int, bytes]:
+    conn = _ENGINE_CONNECTIONS.get(socket_path)
+    if conn is None:
+        conn = _UnixHTTPConnection(socket_path, timeout=DOCKER_TIMEOUT)
+        _ENGINE_CONNECTIONS[socket_path] = conn
+    body = None if payload is None else json.dumps(payload).encode("utf-8")
+    headers = {} if body is None else {"Content-Type": "application/json"}
+    try:
+        conn.request(method, url, body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, response.read()
+    except (OSError, http.client.HTTPException) as exc:
+        conn.close()
+        del _ENGINE_CONNECTIONS[socket_path]
+        raise OSError(f"docker engine request failed: {exc}") from exc
+
+
+def _demux_stream(raw: bytes) -> str:
+    """Join stdout/stderr frames of a non-TTY attach stream into one string."""
+
+    chunks: list[bytes] = []
+    offset = 0
+    header_size = STREAM_FRAME_HEADER.size
+    while offset + header_size <= len(raw):
+        _, size = STREAM_FRAME_HEADER.unpack_from(raw, offset)
+        offset += header_size
+        chunks.append(raw[offset : offset + size])
+        offset += size
+    return b"".join(chunks).decode("utf-8", "replace")
+
+
+def _json_object(body: bytes) -> dict[str, object]:
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return {}
+    return cast("dict[str, object]", data) if isinstance(data, dict) else {}
+
+
+def _engine_error_message(body: bytes) -> str:
+    message = _json_object(body).get("message")
+    if isinstance(message, str):
+        return message
+    return body.decode("utf-8", "replace").strip()
+
+
+def _quote(value: str) -> str:
+    return quote(value, safe="")
+
+
+def _run_docker(args: Sequence[str]) -> subprocess.CompletedProcess[str]:
+    # No preexec_fn, pass_fds, user/group or start_new_session here: any of them
+    # stops CPython from spawning via vfork/posix_spawn and forces a full fork
+    # of the curses process.
+    return subprocess.run(
+        ["docker", *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        timeout=DOCKER_TIMEOUT,
+        check=False,
+    )
@@ -3,10 +3,13 @@
 from __future__ import annotations
 
 import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import contextlib
 from contextlib import AbstractContextManager
 import curses
 from dataclasses import dataclass, replace
+import hashlib
 from pathlib import Path
 from typing import TYPE_CHECKING
 import uuid
@@ -19,15 +22,17 @@ from .singbox_config import (
     DEFAULT_SINGBOX_CONFIG,
     ClientEntry,
     SingBoxConfig,
-    atomic_write_json,
+    atomic_write_bytes,
     backup,
+    client_name,
     clients_from_config_users,
     default_clients,
     default_config,
+    encode_json,
     find_vless_inbound,
     now_ctime,
     read_json,
-    users_from_clients_table,
+    sync_config_users,
 )
 from .terminal import suspend_curses
 from .ui.dialogs import MARK_BOLD_OFF, MARK_BOLD_ON, ModalManager
@@ -36,9 +41,10 @@ from .ui.theme import init_styles
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Sequence
+    from concurrent.futures import Future
 
-with contextlib.suppress(AttributeError):
-    curses.set_escdelay(25)
+BACKGROUND_POLL_MS = 100
+SPINNER_FRAMES = "|/-\\"
 
 
 @dataclass(frozen=True)
@@ -49,6 +55,17 @@ class CommandBinding:
     keys: tuple[int, ...]
     handler: Callable[[], bool]
     show_in_help: bool = True
+    coalesce: bool = False
+
+
+@dataclass
+class BackgroundTask:
+    """Docker command running on a worker thread while the UI stays live."""
+
+    title: str
+    status_label: str
+    future: Future[tuple[bool, str]]
+    ticks: int = 0
 
 
 class App:
@@ -67,31 +84,43 @@ class App:
         """
         self.stdscr = stdscr
         self.settings = settings
-        self.config_path = Path(self.settings.singbox_config)
-        self.table_path = Path(self.settings.clients_table)
-        self.config_file = self.config_path
-        self.table_file = self.table_path
+        self.config_path = self.settings.singbox_config
+        self.table_path = self.settings.clients_table
 
-        self.config: SingBoxConfig = read_json(self.config_file, default_config())
-        self.clients: list[ClientEntry] = read_json(self.table_file, default_clients())
+        self.config: SingBoxConfig = read_json(self.config_path, default_config())
+        self.clients: list[ClientEntry] = read_json(self.table_path, default_clients())
+        self.vless_index: int | None = None
+        self.dirty = False
         if not self.clients:
             try:
-                idx = find_vless_inbound(self.config, self.settings.vless_tag)
+                idx = self.find_vless_index()
                 inbounds = self.config.get("inbounds", [])
                 users = inbounds[idx].get("users", []) if inbounds else []
                 if users:
                     self.clients = clients_from_config_users(users)
+                    self.dirty = True
             except SystemExit:
                 pass
+        self.client_ids: Counter[str] = Counter()
+        self.rebuild_client_ids()
 
         self.cursor = 0
         self.view_top = 0
         self.message = "Loaded."
-        self.dirty = False
+        self.needs_redraw = True
+        self.saved_state: dict[Path, tuple[bytes, int]] = {}
+        self.background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="docker")
+        self.pending_task: BackgroundTask | None = None
         self.command_bindings: tuple[CommandBinding, ...] = (
             self._build_command_bindings()
         )
         self.command_map = self._build_command_map(self.command_bindings)
+        self.coalesced_keys = frozenset(
+            key
+            for binding in self.command_bindings
+            if binding.coalesce
+            for key in binding.keys
+        )
         self.styles = init_styles()
         self.main_view = MainView(
             self.stdscr,
@@ -114,6 +143,20 @@ class App:
             self.stdscr.bkgd(" ", self.styles.get("background", 0))
 
     # ---------- UI helpers ----------
+    def schedule_full_redraw(self) -> None:
+        """Repaint the whole main screen on the next pass of the event loop."""
+
+        self.main_view.invalidate()
+        self.needs_redraw = True
+
+    def _redraw_after(self, modals_before: int) -> None:
+        """Repaint everything after a modal, otherwise only the changed lines."""
+
+        if self.modal.opened != modals_before:
+            self.schedule_full_redraw()
+        else:
+            self.needs_redraw = True
+
     def draw(self) -> None:
         """Render the primary screen through the shared MainView renderer."""
 
@@ -131,7 +174,9 @@ class App:
 
         def run(action: Callable[[], None]) -> Callable[[], bool]:
             def runner() -> bool:
+                modals_before = self.modal.opened
                 action()
+                self._redraw_after(modals_before)
                 return False
 
             return runner
@@ -143,19 +188,36 @@ class App:
 
             return runner
 
-        def save_and_restart() -> bool:
-            self.apply_and_save()
+        def save_and_restart() -> None:
+            if self.dirty:
+                self.apply_and_save()
             self.do_restart()
-            return False
 
         def request_quit() -> bool:
-            return self.confirm_quit()
+            modals_before = self.modal.opened
+            should_quit = self.confirm_quit()
+            self._redraw_after(modals_before)
+            return should_quit
 
         return (
-            CommandBinding("↑/k move up", (curses.KEY_UP, ord("k")), move(-1, True)),
-            CommandBinding("↓/j move down", (curses.KEY_DOWN, ord("j")), move(1, True)),
-            CommandBinding("PgUp prev page", (curses.KEY_PPAGE,), move(-10)),
-            CommandBinding("PgDn next page", (curses.KEY_NPAGE,), move(10)),
+            CommandBinding(
+                "↑/k move up",
+                (curses.KEY_UP, ord("k")),
+                move(-1, True),
+                coalesce=True,
+            ),
+            CommandBinding(
+                "↓/j move down",
+                (curses.KEY_DOWN, ord("j")),
+                move(1, True),
+                coalesce=True,
+            ),
+            CommandBinding(
+                "PgUp prev page", (curses.KEY_PPAGE,), move(-10), coalesce=True
+            ),
+            CommandBinding(
+                "PgDn next page", (curses.KEY_NPAGE,), move(10), coalesce=True
+            ),
             CommandBinding("a add", (ord("a"), ord("A")), run(self.add_client)),
             CommandBinding("e rename", (ord("e"), ord("E")), run(self.rename_client)),
             CommandBinding(
@@ -163,7 +225,7 @@ class App:
             ),
             CommandBinding("d delete", (ord("d"), ord("D")), run(self.delete_client)),
             CommandBinding("s save", (ord("s"),), run(self.apply_and_save)),
-            CommandBinding("S save and restart", (ord("S"),), save_and_restart),
+            CommandBinding("S save and restart", (ord("S"),), run(save_and_restart)),
             CommandBinding("c check", (ord("c"), ord("C")), run(self.do_check)),
             CommandBinding("x restart", (ord("x"), ord("X")), run(self.do_restart)),
             CommandBinding("r reload", (ord("r"),), run(self.reload_all)),
@@ -190,6 +252,9 @@ class App:
 
         if key == -1:
             return False
+        if key == curses.KEY_RESIZE:
+            self.schedule_full_redraw()
+            return False
         handler = self.command_map.get(key)
         return handler() if handler else False
 
@@ -212,6 +277,24 @@ class App:
 
         return self.modal.prompt_buttons(prompt_text, buttons)
 
+    def rebuild_client_ids(self) -> None:
+        """Recount the clientIds used for uniqueness checks.
+
+        Imported tables may repeat an id, so each id is counted and only
+        forgotten once its last row is deleted.
+        """
+
+        self.client_ids = Counter(
+            uid for client in self.clients if (uid := client.get("clientId"))
+        )
+
+    def _forget_client_id(self, client_id: str | None) -> None:
+        if not client_id or client_id not in self.client_ids:
+            return
+        self.client_ids[client_id] -= 1
+        if self.client_ids[client_id] <= 0:
+            del self.client_ids[client_id]
+
     # ---------- actions ----------
     def add_client(self) -> None:
         """Add a new client with a generated UUID."""
@@ -220,6 +303,9 @@ class App:
             self.message = "Add cancelled."
             return
         uid = str(uuid.uuid4())
+        while uid in self.client_ids:
+            uid = str(uuid.uuid4())
+        self.client_ids[uid] += 1
         self.clients.append(
             {
                 "clientId": uid,
@@ -236,12 +322,13 @@ class App:
             self.message = "No clients."
             return
         cur = self.clients[self.cursor]
-        old = (cur.get("userData") or {}).get("clientName", "")
+        old = client_name(cur)
         name = self.prompt_line("Rename client", old)
         if not name:
             self.message = "Rename cancelled."
             return
-        cur["userData"]["clientName"] = name.strip()
+        cur.setdefault("userData", {})["clientName"] = name.strip()
+        self.main_view.invalidate_rows(self.cursor)
         self.dirty = True
         self.message = f"Renamed to {name}."
 
@@ -251,7 +338,7 @@ class App:
             self.message = "No clients."
             return
         cur = self.clients[self.cursor]
-        name = (cur.get("userData") or {}).get("clientName", "")
+        name = client_name(cur)
         ans = self.prompt_buttons(
             f"Delete {MARK_BOLD_ON}{name}{MARK_BOLD_OFF}?",
             [
@@ -260,7 +347,9 @@ class App:
             ],
         )
         if ans == "y":
-            self.clients.pop(self.cursor)
+            removed = self.clients.pop(self.cursor)
+            self._forget_client_id(removed.get("clientId"))
+            self.main_view.invalidate_rows()
             self.cursor = max(0, self.cursor - 1)
             self.dirty = True
             self.message = f"Deleted {name}."
@@ -272,64 +361,133 @@ class App:
         if self.dirty and not self._confirm_discard_or_save():
             self.message = "Reload cancelled."
             return
-        self.config = read_json(self.config_file, default_config())
-        self.clients = read_json(self.table_file, default_clients())
+        self.config = read_json(self.config_path, default_config())
+        self.clients = read_json(self.table_path, default_clients())
+        self.share_flow.singbox_config = self.config
+        self.rebuild_client_ids()
+        self.main_view.invalidate_rows()
+        self.schedule_full_redraw()
         self.cursor = 0
         self.view_top = 0
         self.dirty = False
+        self.vless_index = None
+        self.saved_state.clear()
         self.message = "Reloaded."
 
+    def find_vless_index(self) -> int:
+        """Return the managed VLESS inbound index, rescanning only when stale."""
+        idx = self.vless_index
+        inbounds = self.config.get("inbounds", [])
+        if idx is None or idx >= len(inbounds) or inbounds[idx].get("type") != "vless":
+            idx = find_vless_inbound(self.config, self.settings.vless_tag)
+            self.vless_index = idx
+        return idx
+
     def apply_and_save(self) -> None:
         """Save clients table and update config.json with current users.
 
-        Creates backups of both files before saving.
+        Creates a backup of each file before overwriting it. Files whose
+        serialized content matches the last save are left untouched.
         """
+        if not self.dirty:
+            self.message = "Nothing to save."
+            return
         try:
-            idx = find_vless_inbound(self.config, self.settings.vless_tag)
+            idx = self.find_vless_index()
         except SystemExit as e:
             self.message = str(e)
             return
-        users = users_from_clients_table(self.clients)
-
-        backup(self.table_file)
-        backup(self.config_file)
-
-        atomic_write_json(self.table_file, self.clients)
-        inbounds = self.config.get("inbounds", [])
-        inbounds[idx]["users"] = users
-        self.config["inbounds"] = inbounds
-        atomic_write_json(self.config_file, self.config)
+        sync_config_users(self.config, self.clients, idx)
+        self._write_if_changed(self.table_path, encode_json(self.clients))
+        # sing-box reads config.json on restart, so make it durable first.
+        self._write_if_changed(
+            self.config_path, encode_json(self.config), do_fsync=True
+        )
 
         self.dirty = False
         self.message = "Saved."
 
+    def _write_if_changed(
+        self, path: Path, payload: bytes, *, do_fsync: bool = False
+    ) -> None:
+        digest = hashlib.sha256(payload).digest()
+        previous = self.saved_state.get(path)
+        if previous is not None:
+            with contextlib.suppress(OSError):
+                if previous == (digest, path.stat().st_mtime_ns):
+                    return
+        backup(path)
+        atomic_write_bytes(path, payload, do_fsync=do_fsync)
+        self.saved_state[path] = (digest, path.stat().st_mtime_ns)
+
     def do_check(self) -> None:
-        """Validate the sing-box configuration using Docker."""
+        """Validate the sing-box configuration using Docker in the background."""
         if not self._ensure_saved_before("running Docker check", "Check cancelled."):
             return
-        ok, out = check_config(self.config_path, self.settings.docker_image)
-        visible = self._format_command_output(out)
-        summary = "OK" if ok else "FAIL"
-        self.modal.prompt_buttons(
-            f"Docker check result: {summary}\n{visible}",
-            [("Close", "close")],
+        config_path = self.config_path
+        image = self.settings.docker_image
+        container = self.settings.container
+        self._start_background_task(
+            "Docker check result",
+            "Config check",
+            lambda: check_config(config_path, image, container),
         )
-        self.message = f"Config check: {summary}"
 
     def do_restart(self) -> None:
-        """Restart the sing-box Docker container."""
+        """Restart the sing-box Docker container in the background."""
         if not self._ensure_saved_before(
             "restarting the sing-box container", "Restart cancelled."
         ):
             return
-        ok, out = restart_container(self.settings.container)
+        container = self.settings.container
+        self._start_background_task(
+            "Docker restart result",
+            "Container restart",
+            lambda: restart_container(container),
+        )
+
+    def poll_background_task(self, tick: bool) -> None:
+        """Report a finished Docker command, or advance the spinner on a tick.
+
+        Args:
+            tick (bool): True when the main loop woke up from its poll timeout
+                rather than on a keypress.
+        """
+        task = self.pending_task
+        if task is None:
+            return
+        if not task.future.done():
+            if not tick:
+                return
+            task.ticks += 1
+            frame = SPINNER_FRAMES[task.ticks % len(SPINNER_FRAMES)]
+            self.message = f"{task.status_label}: running {frame}"
+            self.needs_redraw = True
+            return
+        self.pending_task = None
+        ok, out = task.future.result()
         visible = self._format_command_output(out)
         summary = "OK" if ok else "FAIL"
         self.modal.prompt_buttons(
-            f"Docker restart result: {summary}\n{visible}",
+            f"{task.title}: {summary}\n{visible}",
             [("Close", "close")],
         )
-        self.message = f"Container restart: {summary}"
+        self.message = f"{task.status_label}: {summary}"
+        self.schedule_full_redraw()
+
+    def _start_background_task(
+        self,
+        title: str,
+        status_label: str,
+        job: Callable[[], tuple[bool, str]],
+    ) -> None:
+        if self.pending_task is not None:
+            self.message = f"{self.pending_task.status_label} still running."
+            return
+        self.pending_task = BackgroundTask(
+            title, status_label, self.background.submit(job)
+        )
+        self.message = f"{status_label}: running {SPINNER_FRAMES[0]}"
 
     def share_current_client(self) -> None:
         """Generate a vpn:// link and optional QR codes for the selected client."""
@@ -348,14 +506,16 @@ class App:
 
     def move_cursor(self, delta: int, wrap: bool = False) -> None:
         """Move selection cursor by delta, optionally wrapping around list bounds."""
+        previous = self.cursor
         total = len(self.clients)
         if total == 0:
             self.cursor = 0
-            return
-        if wrap:
+        elif wrap:
             self.cursor = (self.cursor + delta) % total
         else:
             self.cursor = min(max(0, self.cursor + delta), total - 1)
+        if self.cursor != previous:
+            self.needs_redraw = True
 
     def confirm_quit(self) -> bool:
         """Prompt to save changes before quitting if there are unsaved changes.
@@ -414,19 +574,51 @@ class App:
             return "\n".join(detail_lines[-5:])
         return "No output captured."
 
+    def _drain_coalesced_keys(self) -> None:
+        """Apply queued navigation keys before the next redraw.
+
+        Key repeat and paste bursts then cost one repaint instead of one per key.
+        The first non-navigation key is pushed back for the main loop.
+        """
+        self.stdscr.timeout(0)
+        while True:
+            try:
+                ch = self.stdscr.getch()
+            except KeyboardInterrupt:
+                ch = 3  # leave Ctrl-C for the main loop to handle
+            if ch == -1:
+                return
+            if ch not in self.coalesced_keys:
+                curses.ungetch(ch)
+                return
+            self.dispatch_command(ch)
+
     # ---------- main loop ----------
     def run(self) -> None:
         """Run main event loop handling keyboard input and updating the UI."""
         curses.curs_set(0)
         self.stdscr.nodelay(False)
+        ch = -1
         while True:
-            self.draw()
+            self.poll_background_task(tick=ch == -1)
+            if self.needs_redraw:
+                self.draw()
+                self.needs_redraw = False
+            self.stdscr.timeout(BACKGROUND_POLL_MS if self.pending_task else -1)
             try:
                 ch = self.stdscr.getch()
             except KeyboardInterrupt:
                 ch = 3  # emulate Ctrl-C keypress
             if self.dispatch_command(ch):
                 break
+            if ch in self.coalesced_keys:
+                self._drain_coalesced_keys()
+        task = self.pending_task
+        if task is not None:
+            # A running docker call cannot be interrupted; say why exit waits.
+            self.message = f"Waiting for {task.status_label.lower()} to finish..."
+            self.draw()
+        self.background.shutdown(wait=True, cancel_futures=True)
 
 
 def main() -> None:
@@ -457,6 +649,9 @@ def main() -> None:
     if args.clients_table is not None:
         settings = replace(settings, clients_table=args.clients_table)
 
+    with contextlib.suppress(AttributeError):
+        curses.set_escdelay(25)
+
     curses.wrapper(lambda stdscr: App(stdscr, settings).run())
 
 
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, fields, replace
+from dataclasses import dataclass, replace
 from pathlib import Path
 import tomllib
+from typing import get_type_hints
 
 from singbox_users.singbox_config import (
     DEFAULT_CLIENTS_TABLE,
@@ -41,22 +42,25 @@ class Settings:
     share_dns2: str = DEFAULT_SHARE_DNS2
 
 
+# Resolved once: with postponed annotations, Field.type is only the string "Path".
+_SETTINGS_FIELDS: tuple[tuple[str, bool], ...] = tuple(
+    (name, hint is Path) for name, hint in get_type_hints(Settings).items()
+)
+
+
 def load_settings(path: Path) -> Settings:
     """Load runtime settings from TOML, falling back to defaults when missing."""
 
-    base = Settings()
     if not path.exists():
-        return base
+        return Settings()
     try:
-        with path.open("rb") as f:
-            data = tomllib.load(f)
-    except (OSError, tomllib.TOMLDecodeError) as e:
+        data = tomllib.loads(path.read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError, tomllib.TOMLDecodeError) as e:
         raise SystemExit(f"ERROR: cannot parse settings at {path}: {e}") from e
     if not isinstance(data, dict):
         raise SystemExit(f"ERROR: settings file {path} must contain a TOML table.")
     overrides: dict[str, object] = {}
-    for field in fields(Settings):
-        key = field.name
+    for key, is_path in _SETTINGS_FIELDS:
         raw = data.get(key)
         if raw is None:
             continue
@@ -66,5 +70,5 @@ def load_settings(path: Path) -> Settings:
             )
         stripped = raw.strip()
         if stripped:
-            overrides[key] = Path(stripped) if field.type is Path else stripped
-    return replace(base, **overrides)  # type: ignore[arg-type]
+            overrides[key] = Path(stripped) if is_path else stripped
+    return replace(Settings(), **overrides)  # type: ignore[arg-type]
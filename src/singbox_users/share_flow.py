@@ -2,18 +2,17 @@
 
 from __future__ import annotations
 
-import base64
+import binascii
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import io
 import json
 import os
 from pathlib import Path
 import subprocess
+import sys
 from typing import TYPE_CHECKING
 
-from imgcat import imgcat  # type: ignore[import-untyped]
-from qrcode import QRCode
-from qrcode.constants import ERROR_CORRECT_L
-from qrcode.image.pil import PilImage
-
 from singbox_users.settings import DEFAULT_SETTINGS_PATH, Settings
 from singbox_users.share_payload import (
     build_outer_share_config,
@@ -34,6 +33,34 @@ if TYPE_CHECKING:
     from singbox_users.ui.dialogs import ModalManager
 
 OSC52_MAX_PAYLOAD = 120000
+QR_PREFETCH_WORKERS = 2
+QR_PNG_CACHE_SIZE = 32
+
+
+@functools.lru_cache(maxsize=QR_PNG_CACHE_SIZE)
+def _render_qr_png(payload: str) -> bytes:
+    """Render one QR payload as PNG bytes, reusing earlier renders."""
+
+    # qrcode pulls in PIL (~60 ms); load it on the first QR, not at startup.
+    from qrcode import QRCode  # noqa: PLC0415
+    from qrcode.constants import ERROR_CORRECT_L  # noqa: PLC0415
+    from qrcode.image.pil import PilImage  # noqa: PLC0415
+
+    qr = QRCode(
+        error_correction=ERROR_CORRECT_L,
+        box_size=6,
+        border=2,
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    img = qr.make_image(
+        image_factory=PilImage,
+        fill_color="black",
+        back_color="white",
+    )
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
 
 
 class ShareFlow:
@@ -52,6 +79,7 @@ class ShareFlow:
         self.modal = modal
         self.suspend_curses = suspend_curses
         self.singbox_config = singbox_config
+        self._server_settings: tuple[SingBoxConfig, ServerSettings] | None = None
 
     def share_client(self, client_id: str) -> str:
         """Run the share modal loop and return the resulting status message."""
@@ -62,7 +90,7 @@ class ShareFlow:
             status = self._display_qr_series(vpn_url, outer_json, qr_payloads)
         return status or "Cancelled."
 
-    def _build_share_payload(self, client_id: str) -> tuple[str, str, list[str]]:
+    def _build_share_payload(self, client_id: str) -> tuple[str, bytes, list[str]]:
         server_ip = self._require_server_ip()
         server_settings = self._load_server_settings()
         outer = build_outer_share_config(
@@ -76,8 +104,9 @@ class ShareFlow:
             port=server_settings.port,
             server_name=server_settings.server_name,
         )
-        outer_json = json.dumps(outer, indent=4, ensure_ascii=False) + "\n"
-        qc = qcompress(outer_json.encode("utf-8"), level=8)
+        outer_text = json.dumps(outer, indent=4, ensure_ascii=False)
+        outer_json = f"{outer_text}\n".encode()
+        qc = qcompress(outer_json)
         url = vpn_url_from_qcompressed(qc)
         try:
             qr_payloads = make_qr_chunks(qc)
@@ -89,12 +118,12 @@ class ShareFlow:
         data = text.encode("utf-8")
         if self._copy_via_tmux(data):
             return
-        b64 = base64.b64encode(data).decode("ascii")
+        b64 = binascii.b2a_base64(data, newline=False)
         if len(b64) > OSC52_MAX_PAYLOAD:
             raise RuntimeError("clipboard payload exceeds OSC-52 limits")
-        osc_sequence = f"\033]52;c;{b64}\a"
+        osc_sequence = b"\033]52;c;" + b64 + b"\a"
         try:
-            with Path("/dev/tty").open("w", encoding="utf-8") as tty:
+            with Path("/dev/tty").open("wb") as tty:
                 tty.write(osc_sequence)
                 tty.flush()
         except OSError as exc:  # pragma: no cover - depends on tty availability
@@ -125,42 +154,40 @@ class ShareFlow:
     def _display_qr_series(
         self,
         vpn_url: str,
-        outer_json: str,
+        outer_json: bytes,
         payloads: list[str],
     ) -> str:
         if not payloads:
             return "No QR payloads to display."
 
-        def build_image(payload: str) -> PilImage:
-            qr = QRCode(
-                error_correction=ERROR_CORRECT_L,
-                box_size=6,
-                border=2,
-            )
-            qr.add_data(payload)
-            qr.make(fit=True)
-            return qr.make_image(
-                image_factory=PilImage,
-                fill_color="black",
-                back_color="white",
-            )
+        from imgcat import imgcat  # type: ignore[import-untyped]  # noqa: PLC0415
 
-        with self.suspend_curses():
-            print("Exported JSON:\n", outer_json, sep="", flush=True)
-            print("Share link:", vpn_url, "\n", flush=True)
-            total = len(payloads)
-            for idx, payload in enumerate(payloads, 1):
-                img = build_image(payload)
-                try:
-                    imgcat(img.get_image(), height=20)
-                except (OSError, RuntimeError) as exc:
-                    return f"imgcat rendering failed: {exc}"
-                print(f"[QR {idx}/{total}] {len(payload)} chars", flush=True)
-                if idx < total:
-                    resp = input("Press Enter for next QR (q to stop): ")
-                    if resp.strip().lower().startswith("q"):
-                        break
-            input("Press Enter to return to singbox-users...")
+        # Render upcoming QR codes while the user is still looking at earlier ones.
+        pool = ThreadPoolExecutor(
+            max_workers=QR_PREFETCH_WORKERS, thread_name_prefix="qr"
+        )
+        futures = [pool.submit(_render_qr_png, payload) for payload in payloads]
+        try:
+            with self.suspend_curses():
+                sys.stdout.buffer.write(b"Exported JSON:\n" + outer_json + b"\n")
+                sys.stdout.buffer.flush()
+                print("Share link:", vpn_url, "\n", flush=True)
+                total = len(payloads)
+                for idx, (payload, future) in enumerate(
+                    zip(payloads, futures, strict=True), 1
+                ):
+                    try:
+                        imgcat(future.result(), height=20)
+                    except (OSError, RuntimeError) as exc:
+                        return f"imgcat rendering failed: {exc}"
+                    print(f"[QR {idx}/{total}] {len(payload)} chars", flush=True)
+                    if idx < total:
+                        resp = input("Press Enter for next QR (q to stop): ")
+                        if resp.strip().lower().startswith("q"):
+                            break
+                input("Press Enter to return to singbox-users...")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
         return "QR display finished."
 
     def _copy_via_tmux(self, data: bytes) -> bool:
@@ -175,16 +202,26 @@ class ShareFlow:
             "-",
         ]
         try:
+            # Keep the spawn arguments plain (see docker_utils._run_docker).
             result = subprocess.run(cmd, input=data, check=False)
         except OSError:
             return False
         return result.returncode == 0
 
     def _load_server_settings(self) -> ServerSettings:
+        # Only users are edited in place, so the Reality settings stay valid
+        # until a different config object is loaded.
+        cached = self._server_settings
+        if cached is not None and cached[0] is self.singbox_config:
+            return cached[1]
         try:
-            return extract_server_settings(self.singbox_config, self.settings.vless_tag)
+            server_settings = extract_server_settings(
+                self.singbox_config, self.settings.vless_tag
+            )
         except (SystemExit, ValueError) as exc:
             raise ValueError(str(exc)) from exc
+        self._server_settings = (self.singbox_config, server_settings)
+        return server_settings
 
     def _require_server_ip(self) -> str:
         server_ip = self.settings.server_ip.strip()
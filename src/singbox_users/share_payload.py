@@ -4,7 +4,6 @@ from __future__ import annotations
 
 import base64
 import json
-import math
 import struct
 from typing import TYPE_CHECKING, Final
 import zlib
@@ -16,9 +15,13 @@ AMNEZIA_XRAY_CONTAINER = "amnezia-xray"
 DEFAULT_QR_CHUNK_SIZE = 850
 MAX_QR_CHUNKS = 255
 QR_MAGIC_QINT16: Final = 1984
+QR_CHUNK_HEADER: Final = struct.Struct(">hBBI")
+# Share configs are ~2 KB of JSON; levels above 6 produce the same size here
+# while spending noticeably more time in the lazy-match search.
+DEFAULT_COMPRESSION_LEVEL = 6
 
 
-def qcompress(payload: bytes, level: int = 8) -> bytes:
+def qcompress(payload: bytes, level: int = DEFAULT_COMPRESSION_LEVEL) -> bytes:
     """Qt-compatible qCompress wrapper (length prefix + zlib)."""
 
     return struct.pack(">I", len(payload)) + zlib.compress(payload, level)
@@ -27,7 +30,7 @@ def qcompress(payload: bytes, level: int = 8) -> bytes:
 def vpn_url_from_qcompressed(qc: bytes) -> str:
     """Return vpn:// URL representation derived from qCompressed bytes."""
 
-    token = base64.urlsafe_b64encode(qc).decode().rstrip("=")
+    token = base64.urlsafe_b64encode(qc).rstrip(b"=").decode("ascii")
     return f"vpn://{token}"
 
 
@@ -35,21 +38,19 @@ def make_qr_chunks(qc: bytes, chunk_size: int = DEFAULT_QR_CHUNK_SIZE) -> list[s
     """Split qCompressed bytes into Base64 payloads matching Amnezia QR format."""
 
     total = len(qc)
-    chunks = max(1, math.ceil(total / chunk_size))
+    chunks = -(-total // chunk_size) if total else 1
     if chunks > MAX_QR_CHUNKS:
         raise ValueError(
             f"Too many chunks ({chunks}); increase chunk size from {chunk_size}"
         )
+    view = memoryview(qc)
     payloads: list[str] = []
     for idx, start in enumerate(range(0, total, chunk_size)):
-        part = qc[start : start + chunk_size]
-        buf = bytearray()
-        buf += struct.pack(">h", QR_MAGIC_QINT16)
-        buf += struct.pack(">B", chunks)
-        buf += struct.pack(">B", idx)
-        buf += struct.pack(">I", len(part))
-        buf += part
-        payloads.append(base64.urlsafe_b64encode(bytes(buf)).decode().rstrip("="))
+        part = view[start : start + chunk_size]
+        header = QR_CHUNK_HEADER.pack(QR_MAGIC_QINT16, chunks, idx, len(part))
+        payloads.append(
+            base64.urlsafe_b64encode(header + part).rstrip(b"=").decode("ascii")
+        )
     return payloads
 
 
@@ -4,18 +4,19 @@ from __future__ import annotations
 
 import base64
 import binascii
+import contextlib
 from dataclasses import dataclass
-from datetime import datetime
+import functools
 import json
+import os
 from pathlib import Path
 import shutil
 import time
-from typing import TYPE_CHECKING, TypedDict, cast
-
-from nacl.bindings import crypto_scalarmult_base
+from typing import TYPE_CHECKING, BinaryIO, TypedDict, cast
+import uuid
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterator, Sequence
 
 DEFAULT_SINGBOX_CONFIG = Path("/opt/singbox/config.json")
 DEFAULT_CLIENTS_TABLE = Path("/opt/singbox/clientsTable.json")
@@ -60,7 +61,7 @@ class SingBoxConfig(TypedDict, total=False):
     inbounds: list[Inbound]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ServerSettings:
     """Subset of Reality/VLESS fields required for share links."""
 
@@ -92,91 +93,165 @@ def default_clients() -> list[ClientEntry]:
 def now_ctime() -> str:
     """Return the current time as a formatted string."""
 
-    return time.ctime()
+    return _ctime_at(int(time.time()))
+
+
+@functools.lru_cache(maxsize=1)
+def _ctime_at(seconds: int) -> str:
+    return time.ctime(seconds)
+
+
+def client_name(client: ClientEntry, default: str = "") -> str:
+    """Return the client's display name without allocating for missing userData."""
+
+    user_data = client.get("userData")
+    return user_data.get("clientName", default) if user_data else default
 
 
 def read_json[T_JSON](path: Path, default: T_JSON) -> T_JSON:
     """Read and parse a JSON file with error handling."""
 
     try:
-        with path.open("r", encoding="utf-8") as f:
-            return cast("T_JSON", json.load(f))
+        return cast("T_JSON", json.loads(path.read_bytes()))
     except FileNotFoundError:
         return default
     except json.JSONDecodeError as e:
         raise SystemExit(f"ERROR: cannot parse JSON at {path}: {e}") from e
 
 
-def atomic_write_json(path: Path, data: JSONData) -> None:
-    """Write JSON data to file atomically to prevent corruption."""
+def encode_json(data: JSONData) -> bytes:
+    """Serialize JSON data into the bytes written to disk."""
+
+    return (json.dumps(data, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def atomic_write_bytes(path: Path, payload: bytes, *, do_fsync: bool = False) -> None:
+    """Write pre-serialized bytes to file atomically to prevent corruption."""
+
+    with _atomic_replace(path, do_fsync=do_fsync) as f:
+        f.write(payload)
+
+
+@contextlib.contextmanager
+def _atomic_replace(path: Path, *, do_fsync: bool = False) -> Iterator[BinaryIO]:
+    """Yield a temp file that replaces ``path`` on success.
+
+    The temp file is uniquely named next to ``path``, so concurrent saves never
+    share it. By default no fsync is issued: the rename alone keeps readers from
+    seeing a partial file. With ``do_fsync`` the data and the directory entry
+    are flushed to disk too, for callers that need the write to survive a crash.
+    """
 
-    tmp_path = Path(f"{path}.tmp")
     path.parent.mkdir(parents=True, exist_ok=True)
-    with tmp_path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-        f.write("\n")
-    tmp_path.replace(path)
+    tmp_path = path.with_name(f"{path.name}.tmp.{os.getpid()}.{uuid.uuid4().hex}")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            if do_fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    if do_fsync:
+        _fsync_dir(path.parent)
+
+
+def _fsync_dir(directory: Path) -> None:
+    dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
 
 
 def backup(path: Path) -> Path | None:
-    """Create a timestamped backup of a file."""
+    """Create a timestamped backup of a file.
+
+    The backup is a hardlink when the filesystem allows it. Saves replace files
+    via rename, so the link keeps pointing at the pre-save content. Otherwise
+    the file contents are copied and only its timestamps are preserved.
+    """
 
     if not path.exists():
         return None
-    ts = datetime.now().strftime("%Y%m%d%H%M%S")
+    ts = time.strftime("%Y%m%d%H%M%S")
     backup_dir = path.parent / "backup"
     backup_dir.mkdir(parents=True, exist_ok=True)
     dst = backup_dir / f"{path.name}.bak.{ts}"
-    shutil.copy2(path, dst)
+    try:
+        dst.hardlink_to(path)
+    except OSError:
+        st = path.stat()
+        shutil.copyfile(path, dst)
+        os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
     return dst
 
 
 def find_vless_inbound(config: SingBoxConfig, tag: str | None) -> int:
-    """Find the index of a VLESS inbound in the config."""
+    """Find the index of a VLESS inbound in the config.
 
-    inbounds = config.get("inbounds", [])
-    if tag:
-        for i, ib in enumerate(inbounds):
-            if ib.get("type") == "vless" and ib.get("tag") == tag:
-                return i
-    for i, ib in enumerate(inbounds):
-        if ib.get("type") == "vless":
+    Prefers the inbound tagged ``tag`` and otherwise falls back to the first
+    VLESS inbound, scanning the list once.
+    """
+
+    first: int | None = None
+    for i, ib in enumerate(config.get("inbounds", [])):
+        if ib.get("type") != "vless":
+            continue
+        if not tag or ib.get("tag") == tag:
             return i
-    raise SystemExit("No VLESS inbound found in config.json")
+        if first is None:
+            first = i
+    if first is None:
+        raise SystemExit("No VLESS inbound found in config.json")
+    return first
 
 
 def users_from_clients_table(clients: Sequence[ClientEntry]) -> list[ConfigUser]:
     """Convert clients table entries to sing-box VLESS user format."""
 
-    out: list[ConfigUser] = []
-    for client in clients:
-        uid = client.get("clientId")
-        user_data = client.get("userData") or {}
-        name = user_data.get("clientName", "client")
-        if not uid:
-            continue
-        out.append({"uuid": uid, "name": name, "flow": DEFAULT_FLOW})
-    return out
+    return [
+        {
+            "uuid": uid,
+            "name": client_name(client, "client"),
+            "flow": DEFAULT_FLOW,
+        }
+        for client in clients
+        if (uid := client.get("clientId"))
+    ]
 
 
 def clients_from_config_users(
     users: Sequence[ConfigUser],
 ) -> list[ClientEntry]:
-    """Convert sing-box VLESS users to clients table format."""
+    """Convert sing-box VLESS users to clients table format.
 
-    out: list[ClientEntry] = []
-    for user in users:
-        uid = user.get("uuid")
-        if not uid:
-            continue
-        name = user.get("name") or "imported"
-        out.append(
-            {
-                "clientId": uid,
-                "userData": {"clientName": name, "creationDate": now_ctime()},
-            }
-        )
-    return out
+    All entries imported in one call share a single creation timestamp.
+    """
+
+    created = now_ctime()
+    return [
+        {
+            "clientId": uid,
+            "userData": {
+                "clientName": user.get("name") or "imported",
+                "creationDate": created,
+            },
+        }
+        for user in users
+        if (uid := user.get("uuid"))
+    ]
+
+
+def sync_config_users(
+    config: SingBoxConfig, clients: Sequence[ClientEntry], index: int
+) -> None:
+    """Replace the users of the inbound at ``index`` with the clients table."""
+
+    config["inbounds"][index]["users"] = users_from_clients_table(clients)
 
 
 def extract_server_settings(config: SingBoxConfig, tag: str | None) -> ServerSettings:
@@ -217,11 +292,8 @@ def _coerce_port(value: object) -> int | None:
     if isinstance(value, int):
         return value
     if isinstance(value, str):
-        stripped = value.strip()
-        if not stripped:
-            return None
         try:
-            return int(stripped, 10)
+            return int(value, 10)
         except ValueError:
             return None
     return None
@@ -233,12 +305,16 @@ def _extract_short_id(ids: list[str]) -> str:
     return ids[0].strip()
 
 
+@functools.lru_cache(maxsize=16)
 def _derive_reality_public_key(private_key: str) -> str:
+    # libsodium is only needed for share links; keep it out of TUI startup.
+    from nacl.bindings import crypto_scalarmult_base  # noqa: PLC0415
+
     scalar = _decode_base64(private_key)
     if len(scalar) != REALITY_KEY_BYTES:
         raise ValueError("Reality private key must decode to 32 bytes.")
     point = crypto_scalarmult_base(scalar)
-    return base64.urlsafe_b64encode(point).decode("ascii").rstrip("=")
+    return base64.urlsafe_b64encode(point).rstrip(b"=").decode("ascii")
 
 
 def _decode_base64(value: str) -> bytes:
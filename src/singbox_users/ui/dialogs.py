@@ -5,6 +5,8 @@ from __future__ import annotations
 import contextlib
 import curses
 from dataclasses import dataclass
+import functools
+import re
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -12,11 +14,24 @@ if TYPE_CHECKING:
 
 MARK_BOLD_ON = "\x01"
 MARK_BOLD_OFF = "\x02"
+MARKUP_SPLIT_RE = re.compile(f"([{MARK_BOLD_ON}{MARK_BOLD_OFF}])")
 CTRL_A = 1
 CTRL_E = 5
 CTRL_K = 11
 CTRL_U = 21
 KEY_BYTE_MAX = 256
+PROMPT_INSTRUCTION_SEGMENTS = ("Esc cancel", "Enter accept", "←→ move", "Ctrl-A/E/U/K")
+
+
+@functools.lru_cache(maxsize=8)
+def _prompt_instructions(max_width: int) -> str:
+    """Return the longest prompt_line key hint that fits in max_width."""
+
+    for count in range(len(PROMPT_INSTRUCTION_SEGMENTS), 0, -1):
+        text = " · ".join(PROMPT_INSTRUCTION_SEGMENTS[:count])
+        if len(text) <= max_width:
+            return text
+    return "Esc cancel"
 
 
 @dataclass
@@ -36,6 +51,9 @@ class ModalManager:
 
         self.stdscr = stdscr
         self.styles = styles
+        # Number of modals shown so far; callers compare it to tell whether the
+        # main screen was covered.
+        self.opened = 0
 
     def prompt_line(
         self, prompt_text: str, initial_text: str | None = None
@@ -56,30 +74,29 @@ class ModalManager:
         ) as (win, height, width):
             cursor = len(value)
             scroll = 0
+            chrome_drawn = False
 
-            def build_instructions(max_width: int) -> str:
-                segments = [
-                    "Esc cancel",
-                    "Enter accept",
-                    "←→ move",
-                    "Ctrl-A/E/U/K",
-                ]
-                while segments:
-                    text = " · ".join(segments)
-                    if len(text) <= max_width:
-                        return text
-                    segments.pop()
-                return "Esc cancel"
-
-            instructions = build_instructions(width - 4)
+            instructions = _prompt_instructions(width - 4)
 
             def redraw_modal(window: curses.window, buffer: list[str]) -> None:
-                nonlocal scroll
-                window.erase()
-                window.border()
-                window.addnstr(1, 2, prompt_text[: width - 4], width - 4)
-                text = "".join(buffer)
+                nonlocal scroll, chrome_drawn
                 input_width = width - 4
+                if not chrome_drawn:
+                    # Border, prompt and key hints only change on resize.
+                    window.erase()
+                    window.border()
+                    window.addnstr(1, 2, prompt_text[:input_width], input_width)
+                    window.addnstr(4, 2, " " * input_width, input_width)
+                    window.addnstr(height - 2, 2, " " * input_width, input_width)
+                    window.addnstr(
+                        height - 2,
+                        2,
+                        instructions[:input_width],
+                        input_width,
+                        curses.A_DIM,
+                    )
+                    chrome_drawn = True
+                text = "".join(buffer)
                 if cursor < scroll:
                     scroll = cursor
                 elif cursor > scroll + input_width:
@@ -89,23 +106,21 @@ class ModalManager:
                 padded = slice_text.ljust(input_width)
                 input_attr = self.styles.get("input_field", curses.A_REVERSE)
                 window.addnstr(3, 2, padded, input_width, input_attr)
-                window.addnstr(4, 2, " " * input_width, input_width)
-                info = instructions[: width - 4]
-                window.addnstr(height - 2, 2, " " * (width - 4), width - 4)
-                window.addnstr(height - 2, 2, info, width - 4, curses.A_DIM)
                 cursor_rel = max(0, min(cursor - scroll, input_width - 1))
-                cursor_char = padded[cursor_rel] if cursor_rel < len(padded) else " "
                 cursor_attr = self.styles.get(
                     "input_cursor", input_attr | curses.A_BOLD
                 )
-                window.addch(3, 2 + cursor_rel, cursor_char or " ", cursor_attr)
+                window.chgat(3, 2 + cursor_rel, 1, cursor_attr)
                 window.refresh()
 
             def redraw() -> None:
                 redraw_modal(win, value)
 
             def handle(ch: int) -> bool:
-                nonlocal cursor, result
+                nonlocal cursor, result, chrome_drawn
+                if ch == curses.KEY_RESIZE:
+                    chrome_drawn = False
+                    return False
                 if ch in (curses.KEY_ENTER, 10, 13):
                     result = None if not value else "".join(value)
                     return True
@@ -147,7 +162,7 @@ class ModalManager:
                     cursor += 1
                 return False
 
-            self._modal_loop(win, redraw, handle)
+            self._modal_loop(win, redraw, handle, lambda: (cursor, "".join(value)))
 
         return result
 
@@ -158,6 +173,11 @@ class ModalManager:
         hint = f"[{'/'.join(choices)}]"
         spec = ModalSpec(header=text, body_lines=[hint], footer="Esc cancel")
         inner_width = max(self._visible_length(text) + len(hint) + 6, 30)
+        accepted = {
+            code: lowered
+            for code in range(KEY_BYTE_MAX)
+            if (lowered := chr(code).lower()) in choices
+        }
         result: str | None = None
 
         with self._modal_window(
@@ -178,14 +198,13 @@ class ModalManager:
                 if ch in (3, 27):
                     result = None
                     return True
-                if 0 <= ch < KEY_BYTE_MAX:
-                    c = chr(ch).lower()
-                    if c in choices:
-                        result = c
-                        return True
+                choice = accepted.get(ch)
+                if choice is not None:
+                    result = choice
+                    return True
                 return False
 
-            self._modal_loop(win, redraw, handle)
+            self._modal_loop(win, redraw, handle, lambda: None)
         return result
 
     def prompt_buttons(
@@ -213,6 +232,7 @@ class ModalManager:
         )
         result: str | None = None
         selected = 0
+        chrome_drawn = False
 
         with self._modal_window(
             inner_width,
@@ -222,15 +242,18 @@ class ModalManager:
         ) as (win, height, width):
 
             def redraw_buttons() -> None:
-                self._render_modal_spec(
-                    win,
-                    width,
-                    height,
-                    ModalSpec(
-                        header=header_line,
-                        body_lines=body_lines,
-                    ),
-                )
+                nonlocal chrome_drawn
+                if not chrome_drawn:
+                    self._render_modal_spec(
+                        win,
+                        width,
+                        height,
+                        ModalSpec(
+                            header=header_line,
+                            body_lines=body_lines,
+                        ),
+                    )
+                    chrome_drawn = True
                 self._draw_button_row(
                     win,
                     button_row_y,
@@ -243,7 +266,10 @@ class ModalManager:
                 redraw_buttons()
 
             def handle(ch: int) -> bool:
-                nonlocal selected, result
+                nonlocal selected, result, chrome_drawn
+                if ch == curses.KEY_RESIZE:
+                    chrome_drawn = False
+                    return False
                 if ch in (27, 3):
                     result = None
                     return True
@@ -258,13 +284,13 @@ class ModalManager:
                     return True
                 return False
 
-            self._modal_loop(win, redraw, handle)
+            self._modal_loop(win, redraw, handle, lambda: selected)
 
         return result
 
     # ---- helpers ----
     def _visible_length(self, text: str) -> int:
-        return sum(ch not in (MARK_BOLD_ON, MARK_BOLD_OFF) for ch in text)
+        return len(text) - text.count(MARK_BOLD_ON) - text.count(MARK_BOLD_OFF)
 
     def _addnstr_with_markup(
         self,
@@ -276,17 +302,17 @@ class ModalManager:
     ) -> None:
         col = 0
         attr = 0
-        for ch in text:
-            if col >= max_width:
-                break
-            if ch == MARK_BOLD_ON:
+        for run in MARKUP_SPLIT_RE.split(text):
+            if run == MARK_BOLD_ON:
                 attr = curses.A_BOLD
-                continue
-            if ch == MARK_BOLD_OFF:
+            elif run == MARK_BOLD_OFF:
                 attr = 0
-                continue
-            window.addnstr(y, x + col, ch, 1, attr)
-            col += 1
+            elif run:
+                space = max_width - col
+                if space <= 0:
+                    break
+                window.addnstr(y, x + col, run, space, attr)
+                col += min(len(run), space)
 
     def _apply_modal_background(self, window: curses.window) -> None:
         attr = self.styles.get("modal_window")
@@ -331,6 +357,7 @@ class ModalManager:
         min_height: int = 5,
     ) -> Iterator[tuple[curses.window, int, int]]:
         self._prepare_modal_interaction()
+        self.opened += 1
         win, height, width = self._spawn_modal_window(
             desired_width,
             desired_height,
@@ -340,28 +367,55 @@ class ModalManager:
         try:
             yield win, height, width
         finally:
+            # Stage the cleared modal and the restored main screen, then flush
+            # them to the terminal in one update.
             win.erase()
-            win.refresh()
+            win.noutrefresh()
             del win
             with contextlib.suppress(curses.error):
                 curses.curs_set(0)
             self.stdscr.touchwin()
-            self.stdscr.refresh()
+            self.stdscr.noutrefresh()
+            curses.doupdate()
 
     def _modal_loop(
         self,
         window: curses.window,
         redraw: Callable[[], None],
         handler: Callable[[int], bool],
+        state: Callable[[], object] | None = None,
     ) -> None:
+        """Feed keys to handler until it returns True.
+
+        Keys that are already queued (a paste, key repeat) are all handled
+        before the next repaint. When ``state`` is given, the modal is repainted
+        only after keys that changed the returned snapshot (or resized the
+        terminal).
+        """
+
+        stale = True
+        drawn: object = None
         while True:
-            redraw()
+            if stale or (state is not None and state() != drawn):
+                redraw()
+                drawn = state() if state is not None else None
+            stale = False
+            ch = self._read_key(window)
+            window.timeout(0)
             try:
-                ch = window.getch()
-            except KeyboardInterrupt:
-                ch = 3
-            if handler(ch):
-                break
+                while ch != -1:
+                    if handler(ch):
+                        return
+                    stale = stale or state is None or ch == curses.KEY_RESIZE
+                    ch = self._read_key(window)
+            finally:
+                window.timeout(-1)
+
+    def _read_key(self, window: curses.window) -> int:
+        try:
+            return window.getch()
+        except KeyboardInterrupt:
+            return 3
 
     def _render_modal_spec(
         self,
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
+from singbox_users.singbox_config import client_name
+
 if TYPE_CHECKING:
+    from collections.abc import Iterable
     import curses
     from pathlib import Path
 
@@ -22,6 +25,29 @@ class MainView:
     table_path: Path
     config_path: Path
 
+    _last_frame: tuple[int, int, int, str, bool] | None = field(
+        default=None, init=False, repr=False
+    )
+    _last_cursor: int = field(default=0, init=False, repr=False)
+    _last_view_top: int = field(default=0, init=False, repr=False)
+    _list_start_y: int = field(default=0, init=False, repr=False)
+    _list_height: int = field(default=1, init=False, repr=False)
+    _status_y: int = field(default=0, init=False, repr=False)
+    _row_cache: dict[int, str] = field(default_factory=dict, init=False, repr=False)
+
+    def invalidate(self) -> None:
+        """Force the next draw to repaint the whole screen."""
+
+        self._last_frame = None
+
+    def invalidate_rows(self, index: int | None = None) -> None:
+        """Drop cached row text for one client, or for every client."""
+
+        if index is None:
+            self._row_cache.clear()
+        else:
+            self._row_cache.pop(index, None)
+
     def draw(
         self,
         bindings: tuple[CommandBinding, ...],
@@ -31,10 +57,45 @@ class MainView:
         message: str,
         dirty: bool,
     ) -> int:
-        """Render the full UI and return the adjusted view_top."""
+        """Render the UI and return the adjusted view_top.
+
+        While the terminal size and the number of clients stay the same, only
+        the lines whose content changed since the previous frame (title,
+        status, affected client rows) are repainted.
+        """
 
-        self.stdscr.erase()
         h, w = self.stdscr.getmaxyx()
+        last = self._last_frame
+        if last is None or last[:3] != (h, w, len(clients)):
+            view_top = self._draw_full(
+                h, w, bindings, clients, cursor, view_top, message, dirty
+            )
+        else:
+            if last[4] != dirty:
+                self._clear_line(0)
+                self._draw_title(w, dirty)
+            if last[3] != message:
+                self._clear_line(self._status_y)
+                self._draw_status(self._status_y, w, message)
+            view_top = self._redraw_client_rows(w, clients, cursor, view_top)
+        self._last_frame = (h, w, len(clients), message, dirty)
+        self._last_cursor = cursor
+        self._last_view_top = view_top
+        self.stdscr.refresh()
+        return view_top
+
+    def _draw_full(
+        self,
+        h: int,
+        w: int,
+        bindings: tuple[CommandBinding, ...],
+        clients: list[ClientEntry],
+        cursor: int,
+        view_top: int,
+        message: str,
+        dirty: bool,
+    ) -> int:
+        self.stdscr.erase()
         content_width = max(10, w - 1)
         self._draw_title(w, dirty)
         list_start_y = self._draw_help_section(1, w, bindings)
@@ -48,6 +109,8 @@ class MainView:
         )
         reserved_bottom = len(footer_path_rows) + 1
         list_height = max(1, h - list_start_y - reserved_bottom)
+        self._list_start_y = list_start_y
+        self._list_height = list_height
         view_top = self._draw_client_rows(
             list_start_y,
             list_height,
@@ -57,7 +120,6 @@ class MainView:
             view_top,
         )
         self._draw_footer(h - reserved_bottom, footer_path_rows, w, message)
-        self.stdscr.refresh()
         return view_top
 
     def _draw_title(self, width: int, dirty: bool) -> None:
@@ -122,29 +184,68 @@ class MainView:
         clients: list[ClientEntry],
         cursor: int,
         view_top: int,
+    ) -> int:
+        view_top = self._clamp_view_top(list_height, len(clients), cursor, view_top)
+        end = min(len(clients), view_top + list_height)
+        for i in range(view_top, end):
+            y = start_y + i - view_top
+            self._draw_client_row(y, width, i, clients[i], i == cursor)
+        return view_top
+
+    def _redraw_client_rows(
+        self,
+        width: int,
+        clients: list[ClientEntry],
+        cursor: int,
+        view_top: int,
+    ) -> int:
+        start_y = self._list_start_y
+        list_height = self._list_height
+        view_top = self._clamp_view_top(list_height, len(clients), cursor, view_top)
+        end = min(len(clients), view_top + list_height)
+        indices: Iterable[int]
+        if view_top == self._last_view_top:
+            indices = {self._last_cursor, cursor}
+        else:
+            indices = range(view_top, end)
+        for i in indices:
+            if view_top <= i < end:
+                y = start_y + i - view_top
+                self._clear_line(y)
+                self._draw_client_row(y, width, i, clients[i], i == cursor)
+        return view_top
+
+    def _clamp_view_top(
+        self, list_height: int, total: int, cursor: int, view_top: int
     ) -> int:
         list_height = max(1, list_height)
-        max_start = max(0, len(clients) - list_height)
+        max_start = max(0, total - list_height)
         view_top = min(view_top, max_start)
         if cursor < view_top:
             view_top = cursor
         elif cursor >= view_top + list_height:
             view_top = cursor - list_height + 1
-        start = view_top
-        rows = clients[start : start + list_height]
-        for idx, client in enumerate(rows):
-            i = start + idx
-            line = self._format_client_row(i, client)
-            attr = self.styles["row_selected"] if i == cursor else self.styles["row"]
-            self.stdscr.addnstr(start_y + idx, 0, line, width - 1, attr)
         return view_top
 
+    def _draw_client_row(
+        self,
+        y: int,
+        width: int,
+        index: int,
+        client: ClientEntry,
+        selected: bool,
+    ) -> None:
+        line = self._row_cache.get(index)
+        if line is None:
+            line = self._row_cache[index] = self._format_client_row(index, client)
+        attr = self.styles["row_selected"] if selected else self.styles["row"]
+        self.stdscr.addnstr(y, 0, line, width - 1, attr)
+
     def _format_client_row(self, index: int, client: ClientEntry) -> str:
         uid = (client.get("clientId") or "")[:36]
-        user_data = client.get("userData") or {}
-        name = user_data.get("clientName", "")
-        created_raw = user_data.get("creationDate", "")
-        created = created_raw[:24]
+        user_data = client.get("userData")
+        name = client_name(client)
+        created = user_data.get("creationDate", "")[:24] if user_data else ""
         row_number = index + 1
         return f"{row_number:>3}  {uid:36}  {created:24}  {name}"
 
@@ -155,17 +256,25 @@ class MainView:
         width: int,
         message: str,
     ) -> None:
+        self._status_y = status_y
+        self._draw_status(status_y, width, message)
+        for idx, text in enumerate(path_rows):
+            self.stdscr.addnstr(
+                status_y + 1 + idx, 0, text, width - 1, self.styles["path"]
+            )
+
+    def _draw_status(self, y: int, width: int, message: str) -> None:
         self.stdscr.addnstr(
-            status_y,
+            y,
             0,
             (message or "")[: width - 1],
             width - 1,
             self.styles["status"],
         )
-        for idx, text in enumerate(path_rows):
-            self.stdscr.addnstr(
-                status_y + 1 + idx, 0, text, width - 1, self.styles["path"]
-            )
+
+    def _clear_line(self, y: int) -> None:
+        self.stdscr.move(y, 0)
+        self.stdscr.clrtoeol()
 
     def _wrap_segments(
         self, segments: list[str], width: int, separator: str = " · "
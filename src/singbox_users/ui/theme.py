@@ -30,6 +30,12 @@ def _hex_to_curses_rgb(code: str) -> tuple[int, int, int]:
     return r_scaled, g_scaled, b_scaled
 
 
+# Palette converted once to the 0-1000 component scale curses.init_color expects.
+CATPPUCCIN_MOCHA_RGB = {
+    name: _hex_to_curses_rgb(code) for name, code in CATPPUCCIN_MOCHA.items()
+}
+
+
 def init_styles() -> dict[str, int]:
     """Return a dict of curses attribute styles (Catppuccin Mocha inspired)."""
 
@@ -62,13 +68,12 @@ def init_styles() -> dict[str, int]:
         if not curses.can_change_color():
             return {}
         base_index = 16
-        required_slots = base_index + len(CATPPUCCIN_MOCHA)
+        required_slots = base_index + len(CATPPUCCIN_MOCHA_RGB)
         if required_slots > curses.COLORS:
             return {}
         assigned: dict[str, int] = {}
-        for offset, (name, code) in enumerate(CATPPUCCIN_MOCHA.items()):
+        for offset, (name, (r, g, b)) in enumerate(CATPPUCCIN_MOCHA_RGB.items()):
             color_id = base_index + offset
-            r, g, b = _hex_to_curses_rgb(code)
             try:
                 curses.init_color(color_id, r, g, b)
             except curses.error: